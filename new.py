@@ -2,14 +2,15 @@ import os
 import openai
 import dotenv
 
-from autogen import config_list_from_json, UserProxyAgent, AssistantAgent, GroupChat, GroupChatManager
-from tools import research, write_content
+from autogen import config_list_from_json, UserProxyAgent, GroupChatManager
+from tools import research, write_content, BoundedAssistantAgent, BoundedGroupChat
 
 dotenv.load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 BROWSERLESS_API_KEY = os.getenv("BROWSERLESS_API_KEY")
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 config_list = config_list_from_json("OAI_CONFIG_LIST")
+llm_config = {"config_list": config_list}
 
 brand_task = input("Please enter the brand or company name: ")
 user_task = input("Please enter the your goal, brief, or problem statement: ")
@@ -19,10 +20,10 @@ llm_config_content_assistant = {
     "timeout": 120,
 }
 
-agency_manager = AssistantAgent(
+agency_manager = BoundedAssistantAgent(
     name="Agency_Manager",
     description="Outlines plan for agents.",
-    llm_config={"config_list": config_list},
+    llm_config=llm_config,
     system_message=f'''
     You are the Project Manager, focusing on {brand_task}. 
     Outline step-by-step tasks for {user_task} with the team. 
@@ -31,7 +32,7 @@ agency_manager = AssistantAgent(
     '''
 )
 
-agency_researcher = AssistantAgent(
+agency_researcher = BoundedAssistantAgent(
     name="Agency_Researcher",
     description="Conducts detailed research to provide insights and information vital for executing user-focused tasks.",
     llm_config=llm_config_content_assistant,
@@ -52,10 +53,10 @@ agency_researcher.register_function(
     }
 )
 
-agency_strategist = AssistantAgent(
+agency_strategist = BoundedAssistantAgent(
     name="Agency_Strategist",
     description="Develops strategic briefs based on market analysis and research findings, focusing on brand positioning and audience insights.",
-    llm_config={"config_list": config_list},
+    llm_config=llm_config,
     system_message=f'''
     As the Lead Strategist, your key task is to develop strategic briefs for {brand_task}, guided by {user_task} objectives. 
     Utilize the insights from Agency_Researcher to inform your strategies, focusing on brand positioning, key messaging, and audience targeting. 
@@ -65,10 +66,10 @@ agency_strategist = AssistantAgent(
     '''
 )
 
-agency_writer = AssistantAgent(
+agency_writer = BoundedAssistantAgent(
     name="Agency_Copywriter",
     description="Creates engaging content and narratives aligned with project goals, using insights from research and strategy.",
-    llm_config={"config_list": config_list},
+    llm_config=llm_config,
     system_message="""
     As the Lead Copywriter, your role is to craft compelling narratives and content.
     Focus on delivering clear, engaging, and relevant messages that resonate with our target audience.
@@ -81,7 +82,7 @@ agency_writer = AssistantAgent(
     },
 )
 
-writing_assistant = AssistantAgent(
+writing_assistant = BoundedAssistantAgent(
     name="writing_assistant",
     description="Versatile assistant skilled in researching various topics and crafting well-written content.",
     llm_config=llm_config_content_assistant,
@@ -96,10 +97,10 @@ writing_assistant = AssistantAgent(
     },
 )
 
-agency_marketer = AssistantAgent(
+agency_marketer = BoundedAssistantAgent(
     name="Agency_Marketer",
     description="Crafts marketing strategies and campaigns attuned to audience needs, utilizing insights from project research and strategy.",
-    llm_config={"config_list": config_list},
+    llm_config=llm_config,
     system_message=f'''
     As the Lead Marketer, utilize insights and strategies to develop marketing ideas that engage our target audience. 
     For {user_task}, create campaigns and initiatives that clearly convey our brand's value. 
@@ -109,10 +110,10 @@ agency_marketer = AssistantAgent(
     '''
 )
 
-agency_mediaplanner = AssistantAgent(
+agency_mediaplanner = BoundedAssistantAgent(
     name="Agency_Media_Planner",
     description="Identifies optimal media channels and strategies for ad delivery, aligned with project goals.",
-    llm_config={"config_list": config_list},
+    llm_config=llm_config,
     system_message=f'''
     As the Lead Media Planner, your task is to identify the ideal media mix for delivering our advertising messages, targeting the client's audience. 
     Utilize the research function to stay updated on current and effective media channels and tactics. 
@@ -122,10 +123,10 @@ agency_mediaplanner = AssistantAgent(
     '''
 )
 
-agency_director = AssistantAgent(
+agency_director = BoundedAssistantAgent(
     name="Agency_Director",
     description="Guides the project's creative vision, ensuring uniqueness, excellence, and relevance in all ideas and executions.",
-    llm_config={"config_list": config_list},
+    llm_config=llm_config,
     system_message="""
     As the Creative Director, your role is to oversee the project's creative aspects. 
     Critically evaluate all work, ensuring each idea is not just unique but also aligns with our standards of excellence. 
@@ -145,7 +146,7 @@ user_proxy = UserProxyAgent(
    system_message='Be a helpful assistant.',
 )
 
-groupchat = GroupChat(agents=[
+groupchat = BoundedGroupChat(agents=[
     user_proxy, agency_manager, agency_researcher, agency_strategist, agency_writer, writing_assistant, agency_marketer, agency_mediaplanner, agency_director], 
     messages=[], 
     max_round=20
@@ -153,7 +154,7 @@ groupchat = GroupChat(agents=[
 
 manager = GroupChatManager(
     groupchat=groupchat, 
-    llm_config={"config_list": config_list}
+    llm_config=llm_config
 )
 
 user_proxy.register_function(
@@ -2,6 +2,9 @@ from autogen import AssistantAgent, UserProxyAgent, config_list_from_json
 import autogen
 import replicate
 import requests
+import shutil
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 import http.client
 import json
@@ -12,6 +15,8 @@ import os
 load_dotenv()
 config_list = config_list_from_json(env_or_file="OAI_CONFIG_LIST")
 llm_config = {"config_list": config_list, "request_timeout": 120}
+session = requests.Session()
+session.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)))
 
 user_prompt = input("Describe an image and art direction: ")
 
@@ -25,11 +30,8 @@ def img_review(image_path, prompt):
         }
     )
 
-    result = ""
-    for item in output:
-        result += item
-
-    return result
+    # llava streams its answer as tokens; join them once
+    return "".join(output)
 
 # function to use stability-ai model to generate image
 def text_to_image_generation(prompt):
@@ -50,13 +52,15 @@ def text_to_image_generation(prompt):
         shortened_prompt = prompt[:50]
         filename = f"imgs/{shortened_prompt}_{current_time}.png"
 
-        response = requests.get(image_url)
-        if response.status_code == 200:
-            with open(filename, "wb") as file:
-                file.write(response.content)
-            return f"Image saved as '{filename}'"
-        else:
-            return "Failed to download and save the image."
+        # Stream the image straight to disk instead of holding it in memory
+        with session.get(image_url, stream=True, timeout=60) as response:
+            if response.status_code == 200:
+                response.raw.decode_content = True
+                with open(filename, "wb") as file:
+                    shutil.copyfileobj(response.raw, file, 65536)
+                return f"Image saved as '{filename}'"
+            else:
+                return "Failed to download and save the image."
     else:
         return "Failed to generate the image."
 
@@ -1,26 +1,116 @@
 import os
+import hashlib
+import inspect
+import tempfile
+import functools
 import requests
 import dotenv 
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+from pathlib import Path
 import autogen
+from concurrent.futures import ThreadPoolExecutor
 import openai
 from autogen import config_list_from_json, UserProxyAgent
-from langchain.chat_models import ChatOpenAI
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.chains.summarize import load_summarize_chain
-from langchain.prompts import PromptTemplate 
+
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+    json_loads = json.loads
 
 dotenv.load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 BROWSERLESS_API_KEY = os.getenv("BROWSERLESS_API_KEY")
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 config_list = config_list_from_json("OAI_CONFIG_LIST")
+llm_config = {"config_list": config_list}
+
+# Shared HTTP session so repeat calls to serper/browserless reuse pooled connections
+http = requests.Session()
+adapter = HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        # A read error on a POST may have been billed already (e.g. a full browserless render)
+        read=0,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=None,
+        raise_on_status=False))
+http.mount("https://", adapter)
+http.mount("http://", adapter)
+
+# Only build the parse tree for tags that carry readable text
+TEXT_TAGS = ["p", "h1", "h2", "h3", "h4", "li", "article"]
+
+# Below this much strained text, fall back to parsing the whole page
+MIN_STRAINED_CHARS = 200
+
+# Stop downloading a scraped page after this many bytes
+MAX_PAGE_BYTES = 200_000
+
+CACHE_DIR = Path(os.getenv("AGENTCY_CACHE_DIR", ".cache"))
+
+@functools.lru_cache(maxsize=None)
+def cache_dir(name):
+    """Return the cache folder for a tool, creating it on first use only."""
+    path = CACHE_DIR / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def write_atomic(path, data):
+    """Write through a temp file so concurrent readers never see a partial entry."""
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except FileNotFoundError:
+        # The cache folder was deleted while the session was running
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def cached(func):
+    """Memoize a tool on disk, keyed by the sha256 of its arguments.
 
+    Empty results are not stored, so failed calls are retried next time.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Bind to parameter names so f("a") and f(x="a") share an entry
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = hashlib.sha256(json_dumps(dict(bound.arguments))).hexdigest()
+        path = cache_dir(func.__name__) / f"{key}.json"
+        try:
+            return json_loads(path.read_bytes())
+        except (OSError, ValueError):
+            # Missing or unreadable entry: treat it as a miss
+            pass
+
+        result = func(*args, **kwargs)
+        if result:
+            write_atomic(path, json_dumps(result))
+        return result
+    return wrapper
+
+@cached
 def search(query):
     url = "https://google.serper.dev/search"
 
-    payload = json.dumps({
+    payload = json_dumps({
         "q": query
     })
     headers = {
@@ -28,45 +118,85 @@ def search(query):
         'Content-Type': 'application/json'
     }
 
-    response = requests.request("POST", url, headers=headers, data=payload)
+    response = http.post(url, headers=headers, data=payload, timeout=30)
+    # Raise on error statuses so a rate-limit or auth error body is never cached
+    response.raise_for_status()
 
-    return response.json()
+    return json_loads(response.content)
 
 def scrape(url: str):
     """Scrape a website and summarize its content if it's too large."""
+    from bs4 import BeautifulSoup, SoupStrainer
+
     print("Scraping website...")
     
     # Define the headers for the request
     headers = {
         'Cache-Control': 'no-cache',
         'Content-Type': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
     }
     
     # Build the POST URL
     post_url = f"https://chrome.browserless.io/content?token={BROWSERLESS_API_KEY}"
     
-    # Send the POST request
-    response = requests.post(post_url, headers=headers, json={"url": url})
-
-    # Check the response status code
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.content, "html.parser")
-        text = soup.get_text()
-        print("CONTENTTTTTT:", text)
-        
-        if len(text) > 8000:
-            output = summary(text)
-            return output
-        else:
-            return text
+    # Send the POST request, streaming so long pages can be cut short
+    with http.post(post_url, headers=headers, json={"url": url}, timeout=60, stream=True) as response:
+        # Check the response status code
+        if response.status_code != 200:
+            print(f"HTTP request failed with status code {response.status_code}")
+            return None
+
+        chunks = []
+        total = 0
+        for chunk in response.iter_content(65536):
+            chunks.append(chunk)
+            total += len(chunk)
+            if total >= MAX_PAGE_BYTES:
+                break
+
+    page = b"".join(chunks)[:MAX_PAGE_BYTES]
+    soup = BeautifulSoup(page, "html.parser", parse_only=SoupStrainer(TEXT_TAGS))
+    text = soup.get_text(" ", strip=True)
+    if len(text) < MIN_STRAINED_CHARS:
+        # Page keeps its text outside the usual tags (div/span/td/pre); parse all of it
+        text = BeautifulSoup(page, "html.parser").get_text(" ", strip=True)
+
+    if len(text) > 8000:
+        output = summary(text)
+        return output
     else:
-        print(f"HTTP request failed with status code {response.status_code}")
+        return text
+
+def scrape_many(urls):
+    """Scrape several websites concurrently, keeping the results in url order."""
+    if not urls:
+        return ""
+
+    def scrape_or_none(url):
+        # One bad url should not discard the pages that did load
+        try:
+            return scrape(url)
+        except Exception as e:
+            print(f"Scraping {url} failed: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(5, len(urls))) as executor:
+        pages = list(executor.map(scrape_or_none, urls))
+
+    return "\n\n".join(f"{url}:\n{page or 'Failed to scrape.'}" for url, page in zip(urls, pages))
+
+@functools.lru_cache(maxsize=None)
+def get_summary_chain():
+    """Build the summarization chain once, on first use; langchain is slow to import."""
+    from langchain.chat_models import ChatOpenAI
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain.chains.summarize import load_summarize_chain
+    from langchain.prompts import PromptTemplate
 
-def summary(content):
     llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo-1106")
     text_splitter = RecursiveCharacterTextSplitter(
         separators=["\n\n", "\n"], chunk_size=10000, chunk_overlap=500)
-    docs = text_splitter.create_documents([content])
     map_prompt = """
     Write a detailed summary of the following text for a research purpose:
     "{text}"
@@ -83,44 +213,75 @@ def summary(content):
         verbose=True
     )
 
-    output = summary_chain.run(input_documents=docs,)
+    return text_splitter, summary_chain
+
+@cached
+def summary(content):
+    from langchain.schema import Document
+
+    text_splitter, summary_chain = get_summary_chain()
+    docs = text_splitter.create_documents([content])
+
+    # Run the map step in parallel, at most 8 OpenAI calls at a time, then reduce once
+    with ThreadPoolExecutor(max_workers=min(8, len(docs)) or 1) as executor:
+        summaries = list(executor.map(
+            lambda doc: summary_chain.llm_chain.predict(text=doc.page_content), docs))
+
+    output = summary_chain.reduce_documents_chain.run(
+        input_documents=[Document(page_content=text) for text in summaries])
 
     return output
 
-def research(query):
-    llm_config_researcher = {
-        "functions": [
-            {
-                "name": "search",
-                "description": "google search for relevant information",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Google search query",
-                        }
-                    },
-                    "required": ["query"],
+llm_config_researcher = {
+    "functions": [
+        {
+            "name": "search",
+            "description": "google search for relevant information",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Google search query",
+                    }
+                },
+                "required": ["query"],
+            },
+        },
+        {
+            "name": "scrape",
+            "description": "Scraping website content based on url",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "description": "Website url to scrape",
+                    }
                 },
+                "required": ["url"],
             },
-            {
-                "name": "scrape",
-                "description": "Scraping website content based on url",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "Website url to scrape",
-                        }
-                    },
-                    "required": ["url"],
+        },
+        {
+            "name": "scrape_many",
+            "description": "Scraping the content of several websites at once based on a list of urls",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "urls": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Website urls to scrape",
+                    }
                 },
+                "required": ["urls"],
             },
-        ],
-        "config_list": config_list}
+        },
+    ],
+    "config_list": config_list}
 
+@cached
+def research(query):
     researcher = autogen.AssistantAgent(
         name="researcher",
         system_message="Research about a given query, collect as many information as possible, and generate detailed research results with loads of technique details with all reference links attached; Add TERMINATE to the end of the research report;",
@@ -135,6 +296,7 @@ def research(query):
         function_map={
             "search": search,
             "scrape": scrape,
+            "scrape_many": scrape_many,
         }
     )
 
@@ -158,7 +320,7 @@ def write_content(research_material, topic):
         Your role is to craft the structure of a short blog post using the material from the Research Assistant. Use your experience to ensure clarity, coherence, and precision. 
         Once structured, pass it to the Writer to pen the final piece.
         ''',
-        llm_config={"config_list": config_list},
+        llm_config=llm_config,
     )
 
     writer = autogen.AssistantAgent(
@@ -171,7 +333,7 @@ def write_content(research_material, topic):
         Approach the topic from a journalistic perspective; aim to inform and engage the readers without adopting a sales-oriented tone. 
         After two rounds of revisions, conclude your post with "TERMINATE".
         ''',
-        llm_config={"config_list": config_list},
+        llm_config=llm_config,
     )
 
     reviewer = autogen.AssistantAgent(
@@ -182,7 +344,7 @@ def write_content(research_material, topic):
         Your role is to meticulously review and critique the written blog, ensuring it meets the highest standards of clarity, coherence, and precision. 
         Provide invaluable feedback to the Writer to elevate the piece. After two rounds of content iteration, conclude with "TERMINATE".
         ''',        
-        llm_config={"config_list": config_list},
+        llm_config=llm_config,
     )
 
     user_proxy = UserProxyAgent(
@@ -207,4 +369,51 @@ def write_content(research_material, topic):
         "Give me the blog that just generated again, return ONLY the blog, and add TERMINATE in the end of the message", manager)
 
     # return the last message the expert received
-    return user_proxy.last_message()["content"]
\ No newline at end of file
+    return user_proxy.last_message()["content"]
+
+# Number of recent turns each agent sees, on top of the opening brief and
+# a summary of everything older
+MAX_HISTORY = 8
+
+def history_window(messages):
+    """Return the opening brief, a summary of older turns and the latest turns of a chat.
+
+    The cut advances in steps of MAX_HISTORY, so the summarized prefix (and its
+    cached summary) only changes every MAX_HISTORY turns. The input list is not modified.
+    """
+    cut = 1 + max(0, len(messages) - 1 - MAX_HISTORY) // MAX_HISTORY * MAX_HISTORY
+    # Keep a function result on the same side of the cut as its call
+    while cut < len(messages) and messages[cut].get("role") == "function":
+        cut += 1
+    if cut <= 1:
+        return messages
+
+    older = "\n\n".join(
+        f"{message.get('name') or message.get('role')}: {message['content']}"
+        for message in messages[1:cut] if message.get("content"))
+    window = messages[:1]
+    if older:
+        try:
+            window.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary(older)}"})
+        except Exception as e:
+            print(f"Summarizing earlier turns failed: {e}")
+    return window + messages[cut:]
+
+class BoundedAssistantAgent(autogen.AssistantAgent):
+    """AssistantAgent that answers from the history window, leaving its stored chat intact."""
+
+    def generate_reply(self, messages=None, sender=None, **kwargs):
+        if messages is None and sender is not None:
+            messages = history_window(self.chat_messages[sender])
+        return super().generate_reply(messages=messages, sender=sender, **kwargs)
+
+class BoundedGroupChat(autogen.GroupChat):
+    """GroupChat whose manager only sends the history window when picking the next speaker."""
+
+    def select_speaker(self, last_speaker, selector):
+        messages = self.messages
+        self.messages = history_window(messages)
+        try:
+            return super().select_speaker(last_speaker, selector)
+        finally:
+            self.messages = messages